@@ -1,4 +1,6 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import openai
 from github import Github
 from github import Auth
@@ -8,43 +10,88 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_NAME = os.getenv("REPO_NAME")
 PR_NUMBER = os.getenv("PR_NUMBER")
 
+# Limite de linhas únicas enviadas ao modelo (controla custo e tamanho do prompt)
+MAX_LINT_LINES = 800
+
 openai.api_key = OPENAI_API_KEY
 
+# Lê a saída linha a linha, removendo duplicadas dentro de cada seção e parando no limite.
+# Cada ferramenta do lint.sh abre sua seção com um cabeçalho terminado em ":" após uma
+# linha em branco; o mesmo arquivo pode aparecer em seções diferentes (ex.: gofmt e goimports)
+seen = set()
+lint_lines = []
+truncated = False
+previous_blank = True
 with open('lint_output.txt', 'r') as file:
-    lint_output = file.read().strip()
+    for line in file:
+        key = line.strip()
+        is_section_header = previous_blank and key.endswith(":")
+        previous_blank = not key
+        if is_section_header:
+            seen = set()
+        if not key or key in seen:
+            continue
+        if len(lint_lines) >= MAX_LINT_LINES:
+            truncated = True
+            break
+        seen.add(key)
+        lint_lines.append(line.rstrip())
+
+lint_output = "\n".join(lint_lines)
+if truncated:
+    lint_output += f"\n... (saída truncada em {MAX_LINT_LINES} linhas)"
 
 # Se não houver saída de lint, não comenta nada
 if not lint_output:
     print("Nenhum problema de lint encontrado. Nenhum comentário será criado.")
     exit(0)
 
-prompt = f"""
-Você é um engenheiro de software sênior revisando um pull request. O CI identificou os seguintes problemas de lint e qualidade de código Go. Para cada problema, gere um comentário técnico claro e objetivo, explicando:
+# Instruções fixas ficam na mensagem de sistema, separadas da saída do lint,
+# que vai na mensagem do usuário
+SYSTEM_PROMPT = """
+Você é um engenheiro de software sênior revisando um pull request. O CI identificou problemas de lint e qualidade de código Go, que serão enviados na mensagem do usuário. Para cada problema, gere um comentário técnico claro e objetivo, explicando:
 
 * **Descrição do Problema:** Explique o que está errado e por que é importante corrigir.
 * **Localização:** Se possível, indique o arquivo/trecho afetado.
 * **Sugestão de Correção:** Dê dicas práticas de como resolver, incluindo comandos ou exemplos se necessário.
 
-Os problemas encontrados foram:
-{lint_output}
-
 Formate sua resposta como uma lista numerada em markdown, com um item para cada problema identificado.
 """
 
-response = openai.chat.completions.create(
-    model="gpt-4o-mini",
-    messages=[
-        {"role": "system", "content": prompt},
-    ],
-)
+def post_progress_comment():
+    auth = Auth.Token(GITHUB_TOKEN)
+    git = Github(auth=auth)
+    repo = git.get_repo(REPO_NAME)
+    pull_request = repo.get_pull(int(PR_NUMBER))
+    return pull_request.create_issue_comment("⏳ Análise de lint em andamento...")
+
+# O comentário de progresso é publicado em paralelo enquanto a resposta do modelo é recebida
+with ThreadPoolExecutor(max_workers=1) as executor:
+    progress_comment = executor.submit(post_progress_comment)
+
+    try:
+        stream = openai.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"Os problemas encontrados foram:\n{lint_output}"},
+            ],
+            stream=True,
+        )
 
-detailed_report = response.choices[0].message.content.strip()
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+    except Exception as e:
+        # Não deixa o comentário de progresso pendurado no PR quando a análise falha.
+        # Se a publicação do próprio comentário falhou, não há o que editar e o erro original é mantido
+        if progress_comment.exception() is None:
+            progress_comment.result().edit(f"### Problemas de Lint encontrados pelo CI\n\n❌ Não foi possível gerar a análise detalhada: {e}\n\nConsulte o log do CI ou rode `.config/scripts/lint.sh` localmente.")
+        raise
 
-auth = Auth.Token(GITHUB_TOKEN)
-git = Github(auth=auth)
-repo = git.get_repo(REPO_NAME)
-pull_request = repo.get_pull(int(PR_NUMBER))
+    detailed_report = "".join(parts).strip()
 
-comment_body = f"### Problemas de Lint encontrados pelo CI\n\n{detailed_report}\n\n**Sugestões:**\n\n- Corrija os problemas apontados para garantir a qualidade e padronização do código.\n- Utilize o script `.config/scripts/lint.sh` localmente para validar antes de subir novas alterações."
+    comment_body = f"### Problemas de Lint encontrados pelo CI\n\n{detailed_report}\n\n**Sugestões:**\n\n- Corrija os problemas apontados para garantir a qualidade e padronização do código.\n- Utilize o script `.config/scripts/lint.sh` localmente para validar antes de subir novas alterações."
 
-pull_request.create_issue_comment(comment_body) 
\ No newline at end of file
+    progress_comment.result().edit(comment_body)
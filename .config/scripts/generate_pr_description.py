@@ -1,70 +1,169 @@
 import os
+import re
 
 import openai
-from github import Github
+import requests
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_NAME = os.getenv("REPO_NAME")
 PR_NUMBER = os.getenv("PR_NUMBER")
 
+GITHUB_API_URL = "https://api.github.com"
+
 openai.api_key = OPENAI_API_KEY
-gh = Github(GITHUB_TOKEN)
+github_session = requests.Session()
+github_session.headers.update({
+    "Authorization": f"bearer {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github+json",
+})
 
-def generate_description(pr_number, repository):
-    pr = repository.get_pull(int(pr_number))
-    title = pr.title
-    body = pr.body
-    files_changed = [f.filename for f in pr.get_files()]
-    commits = [c.commit.message for c in pr.get_commits()]
+# Title, body, diff size, files and commits in a single GraphQL round-trip
+PR_DETAILS_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      title
+      body
+      additions
+      deletions
+      changedFiles
+      files(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { path }
+      }
+      commits(first: 100) {
+        totalCount
+        pageInfo { hasNextPage }
+        nodes { commit { message } }
+      }
+    }
+  }
+}
+"""
 
-    prompt = f"""
-    You're a senior software engineer creating a pull request.
-    Generate a detailed description for a GitHub Pull Request.
+# Static instructions are kept in the system message, apart from the PR data
+# sent in the user message
+SYSTEM_PROMPT = """
+You're a senior software engineer creating a pull request.
+Generate a detailed description for a GitHub Pull Request from the title,
+existing body, modified files and commit messages sent by the user.
 
-    **Title:** {title}
-    **Body (Existing):** {body or "No existing body content."}
-    **Modified files:** {files_changed}
-    **Commit Messages:** {commits}
+The description should be concise, clear, and informative for reviewers. Include:
+* Briefly summarize the changes implemented.
+* Explain the context or problem being solved.
+* Provide clear steps for testing the changes.
+* Highlight any potential issues or considerations for reviewers.
+* Use Markdown formatting for readability.
+
+Format the response in a well-organized and readable way (using markdown).
+"""
+
+# PRs below this many changed lines, or touching only docs, skip the LLM call.
+# PRs whose file or commit list was cut off by GraphQL paging are never trivial,
+# since the files we did not see may not be docs.
+TRIVIAL_DIFF_LINES = 20
+DOCS_ONLY_PATTERN = re.compile(r"^(docs/|CHANGELOG)|\.md$")
+
+def is_trivial_change(files_changed, diff_size, truncated):
+    if truncated:
+        return False
+    if diff_size < TRIVIAL_DIFF_LINES:
+        return True
+    return all(DOCS_ONLY_PATTERN.search(filename) for filename in files_changed)
+
+# Built only from title, files and commits: the result replaces the PR body, so
+# embedding the current body would nest a new copy on every push
+def build_trivial_description(title, files_changed, commits):
+    files_list = "\n".join(f"- `{filename}`" for filename in files_changed)
+    commits_list = "\n".join(f"- {message.splitlines()[0]}" for message in commits if message)
+    return f"""## {title}
+
+### Modified files
+{files_list}
 
-    The description should be concise, clear, and informative for reviewers. Include:
-    * Briefly summarize the changes implemented.
-    * Explain the context or problem being solved.
-    * Provide clear steps for testing the changes.
-    * Highlight any potential issues or considerations for reviewers.
-    * Use Markdown formatting for readability.
+### Commits
+{commits_list}
+"""
 
-    Format the response in a well-organized and readable way (using markdown).
+def fetch_pr_details(pr_number):
+    owner, repo = REPO_NAME.split("/", 1)
+    response = github_session.post(
+        f"{GITHUB_API_URL}/graphql",
+        json={
+            "query": PR_DETAILS_QUERY,
+            "variables": {"owner": owner, "repo": repo, "number": int(pr_number)},
+        },
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("errors"):
+        raise RuntimeError(f"GitHub GraphQL error: {payload['errors']}")
+    return payload["data"]["repository"]["pullRequest"]
+
+def comment_on_pr(pr_number, message):
+    github_session.post(
+        f"{GITHUB_API_URL}/repos/{REPO_NAME}/issues/{pr_number}/comments",
+        json={"body": message},
+        timeout=30,
+    )
+
+def generate_description(pr_number):
+    pr = fetch_pr_details(pr_number)
+    title = pr["title"]
+    body = pr["body"]
+    files_changed = [f["path"] for f in pr["files"]["nodes"]]
+    commits = [c["commit"]["message"] for c in pr["commits"]["nodes"]]
+    files_truncated = pr["files"]["pageInfo"]["hasNextPage"]
+    commits_truncated = pr["commits"]["pageInfo"]["hasNextPage"]
+
+    diff_size = pr["additions"] + pr["deletions"]
+    if is_trivial_change(files_changed, diff_size, files_truncated or commits_truncated):
+        print(f"Skipping OpenAI for trivial PR ({diff_size} changed lines, {len(files_changed)} files).")
+        return build_trivial_description(title, files_changed, commits)
+
+    files_note = f" (first {len(files_changed)} of {pr['changedFiles']})" if files_truncated else ""
+    commits_note = f" (first {len(commits)} of {pr['commits']['totalCount']})" if commits_truncated else ""
+
+    pr_details = f"""
+    **Title:** {title}
+    **Body (Existing):** {body or "No existing body content."}
+    **Modified files:** {files_changed}{files_note}
+    **Commit Messages:** {commits}{commits_note}
     """
 
     try :
         response = openai.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": pr_details},
             ],
             temperature=0.7
         )
         description = response.choices[0].message.content.strip()
         return description
     except Exception as e:
-        pr.create_issue_comment(f"An error occurred while generating the description: {e}")
+        comment_on_pr(pr_number, f"An error occurred while generating the description: {e}")
         exit(1)
 
 def update_pr_description(pr_number, new_description):
-    repository = gh.get_repo(REPO_NAME)
-    pr = repository.get_pull(int(pr_number))
     try:
-        pr.edit(body=new_description)
+        response = github_session.patch(
+            f"{GITHUB_API_URL}/repos/{REPO_NAME}/pulls/{pr_number}",
+            json={"body": new_description},
+            timeout=30,
+        )
+        response.raise_for_status()
         print(f"Description of PR #{pr_number} updated successfully.")
     except Exception as e:
-        pr.create_issue_comment(f"An error occurred while updating the description: {e}")
+        comment_on_pr(pr_number, f"An error occurred while updating the description: {e}")
         exit(1)
 
 
 if __name__ == "__main__":
     print(f"Generating description for PR #{PR_NUMBER} in {REPO_NAME}...")
-    repo = gh.get_repo(REPO_NAME)
-    generated_description = generate_description(PR_NUMBER, repo)
+    generated_description = generate_description(PR_NUMBER)
     update_pr_description(PR_NUMBER, generated_description)
     print("Description generation and update complete.")
\ No newline at end of file
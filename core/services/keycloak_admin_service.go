@@ -8,6 +8,8 @@ import (
 	"io"
 	"net/http"
 	"net/url"
+	"strconv"
+	"sync"
 	"time"
 
 	"github.com/RodolfoBonis/spooliq/core/config"
@@ -16,6 +18,17 @@ import (
 	"github.com/RodolfoBonis/spooliq/core/logger"
 )
 
+// Retry policy for transient Keycloak Admin API failures (throttling and gateway errors)
+const (
+	keycloakMaxRetries     = 3
+	keycloakRetryBaseDelay = 500 * time.Millisecond
+	keycloakMaxRetryDelay  = 10 * time.Second
+)
+
+// Every admin call goes to the same Keycloak host, so keep enough idle
+// connections around for concurrent requests to reuse warm TLS sessions
+const keycloakMaxIdleConnsPerHost = 32
+
 // IKeycloakAdminService defines the interface for Keycloak Admin API interactions.
 type IKeycloakAdminService interface {
 	CreateUser(ctx context.Context, req KeycloakUserRequest) (string, *errors.AppError)
@@ -38,8 +51,12 @@ type KeycloakAdminService struct {
 	adminPassword string
 	logger        logger.Logger
 	client        *http.Client
+	tokenMu       sync.RWMutex
 	accessToken   string
 	tokenExpiry   time.Time
+	refreshToken  string
+	refreshExpiry time.Time
+	roleCache     sync.Map // role name -> realm role representation
 }
 
 // KeycloakUserRequest represents a request to create a user in Keycloak
@@ -78,6 +95,7 @@ type KeycloakTokenResponse struct {
 	AccessToken      string `json:"access_token"`
 	ExpiresIn        int    `json:"expires_in"`
 	RefreshExpiresIn int    `json:"refresh_expires_in"`
+	RefreshToken     string `json:"refresh_token"`
 	TokenType        string `json:"token_type"`
 }
 
@@ -106,20 +124,114 @@ func NewKeycloakAdminService(cfg *config.AppConfig, logger logger.Logger) IKeycl
 		adminPassword: cfg.Keycloak.AdminPassword,
 		logger:        logger,
 		client: &http.Client{
-			Timeout: 10 * time.Second,
+			Timeout:   10 * time.Second,
+			Transport: newKeycloakTransport(),
 		},
 	}
 }
 
-// getAccessToken obtains an access token from Keycloak using admin credentials
-func (s *KeycloakAdminService) getAccessToken(ctx context.Context) *errors.AppError {
+// newKeycloakTransport clones the default transport (keep-alive dialer, HTTP/2)
+// and raises the per-host idle connection limit from its default of 2
+func newKeycloakTransport() *http.Transport {
+	transport := http.DefaultTransport.(*http.Transport).Clone()
+	transport.MaxIdleConnsPerHost = keycloakMaxIdleConnsPerHost
+	return transport
+}
+
+// sendWithRetry sends a request, retrying with exponential backoff when Keycloak
+// answers 429 or 503 (and 502/504 for idempotent methods). A Retry-After header,
+// when present, takes precedence.
+func (s *KeycloakAdminService) sendWithRetry(ctx context.Context, req *http.Request) (*http.Response, error) {
+	delay := keycloakRetryBaseDelay
+	for attempt := 1; ; attempt++ {
+		resp, err := s.client.Do(req)
+		if err != nil || attempt > keycloakMaxRetries || !isRetryableStatus(req.Method, resp.StatusCode) {
+			return resp, err
+		}
+		resp.Body.Close()
+
+		wait := delay
+		if seconds, convErr := strconv.Atoi(resp.Header.Get("Retry-After")); convErr == nil && seconds >= 0 {
+			wait = time.Duration(seconds) * time.Second
+		}
+		if wait > keycloakMaxRetryDelay {
+			wait = keycloakMaxRetryDelay
+		}
+
+		s.logger.Warning(ctx, "Keycloak request failed transiently, retrying", map[string]interface{}{
+			"status":  resp.StatusCode,
+			"attempt": attempt,
+			"wait":    wait.String(),
+			"url":     req.URL.String(),
+		})
+
+		select {
+		case <-ctx.Done():
+			return nil, ctx.Err()
+		case <-time.After(wait):
+		}
+		delay *= 2
+
+		// Rewind the body for the next attempt
+		if req.GetBody != nil {
+			body, bodyErr := req.GetBody()
+			if bodyErr != nil {
+				return nil, bodyErr
+			}
+			req.Body = body
+		}
+	}
+}
+
+// isRetryableStatus reports whether a Keycloak response status is worth retrying.
+// 429 and 503 mean the request was not processed, so they are safe for any method.
+// A 502/504 from a gateway may hide a request Keycloak already applied, so those
+// are only retried for methods other than POST.
+func isRetryableStatus(method string, status int) bool {
+	switch status {
+	case http.StatusTooManyRequests, http.StatusServiceUnavailable:
+		return true
+	case http.StatusBadGateway, http.StatusGatewayTimeout:
+		return method != http.MethodPost
+	}
+	return false
+}
+
+// getAccessToken returns a cached admin access token, obtaining a new one from Keycloak when it has expired
+func (s *KeycloakAdminService) getAccessToken(ctx context.Context) (string, *errors.AppError) {
 	// Check if token is still valid
+	s.tokenMu.RLock()
 	if s.accessToken != "" && time.Now().Before(s.tokenExpiry) {
-		return nil
+		token := s.accessToken
+		s.tokenMu.RUnlock()
+		return token, nil
 	}
+	s.tokenMu.RUnlock()
 
-	// Use master realm for admin authentication
-	tokenURL := fmt.Sprintf("%s/realms/master/protocol/openid-connect/token", s.baseURL)
+	s.tokenMu.Lock()
+	defer s.tokenMu.Unlock()
+
+	// Another request may have refreshed the token while we waited for the lock
+	if s.accessToken != "" && time.Now().Before(s.tokenExpiry) {
+		return s.accessToken, nil
+	}
+
+	// Prefer the refresh token grant: it avoids re-verifying the admin password on Keycloak
+	if s.refreshToken != "" && time.Now().Before(s.refreshExpiry) {
+		data := url.Values{}
+		data.Set("grant_type", "refresh_token")
+		data.Set("client_id", "admin-cli")
+		data.Set("refresh_token", s.refreshToken)
+
+		tokenResp, err := s.requestToken(ctx, data)
+		if err == nil {
+			s.storeToken(tokenResp)
+			return s.accessToken, nil
+		}
+
+		// Refresh token rejected (revoked or session ended), fall back to password grant
+		s.logger.Warning(ctx, "Keycloak token refresh failed, re-authenticating", map[string]interface{}{"error": err.Error()})
+	}
 
 	// Use password grant type with admin credentials (URL-encoded)
 	data := url.Values{}
@@ -128,46 +240,79 @@ func (s *KeycloakAdminService) getAccessToken(ctx context.Context) *errors.AppEr
 	data.Set("username", s.adminUsername)
 	data.Set("password", s.adminPassword)
 
+	tokenResp, err := s.requestToken(ctx, data)
+	if err != nil {
+		return "", err
+	}
+
+	s.storeToken(tokenResp)
+	return s.accessToken, nil
+}
+
+// requestToken performs a token request against the master realm (used for admin authentication)
+func (s *KeycloakAdminService) requestToken(ctx context.Context, data url.Values) (*KeycloakTokenResponse, *errors.AppError) {
+	tokenURL := fmt.Sprintf("%s/realms/master/protocol/openid-connect/token", s.baseURL)
+
 	req, err := http.NewRequestWithContext(ctx, http.MethodPost, tokenURL, bytes.NewBufferString(data.Encode()))
 	if err != nil {
 		s.logger.Error(ctx, "Failed to create token request", map[string]interface{}{"error": err.Error()})
-		return errors.NewAppError(entities.ErrService, "Failed to authenticate with Keycloak", nil, err)
+		return nil, errors.NewAppError(entities.ErrService, "Failed to authenticate with Keycloak", nil, err)
 	}
 
 	req.Header.Set("Content-Type", "application/x-www-form-urlencoded")
 
-	resp, err := s.client.Do(req)
+	resp, err := s.sendWithRetry(ctx, req)
 	if err != nil {
 		s.logger.Error(ctx, "Failed to get access token", map[string]interface{}{"error": err.Error()})
-		return errors.NewAppError(entities.ErrService, "Failed to authenticate with Keycloak", nil, err)
+		return nil, errors.NewAppError(entities.ErrService, "Failed to authenticate with Keycloak", nil, err)
 	}
 	defer resp.Body.Close()
 
 	if resp.StatusCode != http.StatusOK {
 		body, _ := io.ReadAll(resp.Body)
 		s.logger.Error(ctx, "Keycloak token request failed", map[string]interface{}{
-			"status": resp.StatusCode,
-			"body":   string(body),
+			"status":     resp.StatusCode,
+			"body":       string(body),
+			"grant_type": data.Get("grant_type"),
 		})
-		return errors.NewAppError(entities.ErrService, "Failed to authenticate with Keycloak", nil, fmt.Errorf("status: %d", resp.StatusCode))
+		return nil, errors.NewAppError(entities.ErrService, "Failed to authenticate with Keycloak", nil, fmt.Errorf("status: %d", resp.StatusCode))
 	}
 
 	var tokenResp KeycloakTokenResponse
 	if err := json.NewDecoder(resp.Body).Decode(&tokenResp); err != nil {
 		s.logger.Error(ctx, "Failed to decode token response", map[string]interface{}{"error": err.Error()})
-		return errors.NewAppError(entities.ErrService, "Failed to process Keycloak response", nil, err)
+		return nil, errors.NewAppError(entities.ErrService, "Failed to process Keycloak response", nil, err)
 	}
 
+	return &tokenResp, nil
+}
+
+// storeToken caches the tokens from a token response; callers must hold tokenMu
+func (s *KeycloakAdminService) storeToken(tokenResp *KeycloakTokenResponse) {
+	now := time.Now()
 	s.accessToken = tokenResp.AccessToken
-	s.tokenExpiry = time.Now().Add(time.Duration(tokenResp.ExpiresIn-60) * time.Second) // Refresh 60s before expiry
+	s.tokenExpiry = now.Add(tokenLifetime(tokenResp.ExpiresIn, 60*time.Second)) // Refresh up to 60s before expiry
+	s.refreshToken = tokenResp.RefreshToken
+	s.refreshExpiry = now.Add(tokenLifetime(tokenResp.RefreshExpiresIn, 30*time.Second))
+}
 
-	return nil
+// tokenLifetime returns how long a token may be reused: its lifetime minus a safety
+// skew, bounded to half the lifetime so short-lived tokens (Keycloak's admin-cli
+// default is 60s) are still reusable right after being fetched
+func tokenLifetime(expiresIn int, maxSkew time.Duration) time.Duration {
+	lifetime := time.Duration(expiresIn) * time.Second
+	skew := maxSkew
+	if lifetime/2 < skew {
+		skew = lifetime / 2
+	}
+	return lifetime - skew
 }
 
 // doRequest performs an authenticated request to Keycloak Admin API
 func (s *KeycloakAdminService) doRequest(ctx context.Context, method, path string, body interface{}, response interface{}) *errors.AppError {
-	if err := s.getAccessToken(ctx); err != nil {
-		return err
+	token, appErr := s.getAccessToken(ctx)
+	if appErr != nil {
+		return appErr
 	}
 
 	url := fmt.Sprintf("%s/admin/realms/%s/%s", s.baseURL, s.realm, path)
@@ -189,9 +334,9 @@ func (s *KeycloakAdminService) doRequest(ctx context.Context, method, path strin
 	}
 
 	req.Header.Set("Content-Type", "application/json")
-	req.Header.Set("Authorization", fmt.Sprintf("Bearer %s", s.accessToken))
+	req.Header.Set("Authorization", fmt.Sprintf("Bearer %s", token))
 
-	resp, err := s.client.Do(req)
+	resp, err := s.sendWithRetry(ctx, req)
 	if err != nil {
 		s.logger.Error(ctx, "Failed to send HTTP request to Keycloak", map[string]interface{}{"error": err.Error()})
 		return errors.NewAppError(entities.ErrService, "Failed to communicate with Keycloak", nil, err)
@@ -204,6 +349,17 @@ func (s *KeycloakAdminService) doRequest(ctx context.Context, method, path strin
 		return errors.NewAppError(entities.ErrService, "Failed to process Keycloak response", nil, err)
 	}
 
+	// Conflicts are returned as ErrConflict so callers such as GetOrCreateGroup can branch on them
+	if resp.StatusCode == http.StatusConflict {
+		s.logger.Error(ctx, "Keycloak API returned a conflict", map[string]interface{}{
+			"status_code":   resp.StatusCode,
+			"method":        method,
+			"response_body": string(respBody),
+			"url":           url,
+		})
+		return errors.NewAppError(entities.ErrConflict, fmt.Sprintf("Keycloak API error: %s", string(respBody)), nil, fmt.Errorf("status: %d", resp.StatusCode))
+	}
+
 	if resp.StatusCode >= 400 {
 		s.logger.Error(ctx, "Keycloak API returned an error", map[string]interface{}{
 			"status_code":   resp.StatusCode,
@@ -213,6 +369,15 @@ func (s *KeycloakAdminService) doRequest(ctx context.Context, method, path strin
 		return errors.NewAppError(entities.ErrService, fmt.Sprintf("Keycloak API error: %s", string(respBody)), nil, fmt.Errorf("status: %d", resp.StatusCode))
 	}
 
+	// Handle 201 Created with Location header: the created resource ID is returned
+	// without an extra lookup when the caller asks for it as a *string
+	if resp.StatusCode == http.StatusCreated {
+		if idPtr, ok := response.(*string); ok {
+			*idPtr = idFromLocation(resp.Header.Get("Location"))
+			return nil
+		}
+	}
+
 	if response != nil && len(respBody) > 0 {
 		if err := json.Unmarshal(respBody, response); err != nil {
 			s.logger.Error(ctx, "Failed to unmarshal response", map[string]interface{}{"error": err.Error()})
@@ -220,48 +385,41 @@ func (s *KeycloakAdminService) doRequest(ctx context.Context, method, path strin
 		}
 	}
 
-	// Handle 201 Created with Location header (for user creation)
-	if resp.StatusCode == http.StatusCreated && response == nil {
-		location := resp.Header.Get("Location")
-		if location != "" {
-			// Extract user ID from location header
-			// Location format: .../users/{user-id}
-			parts := bytes.Split([]byte(location), []byte("/"))
-			if len(parts) > 0 {
-				userID := string(parts[len(parts)-1])
-				if strPtr, ok := response.(*string); ok {
-					*strPtr = userID
-				}
-			}
-		}
-	}
-
 	return nil
 }
 
+// idFromLocation extracts the resource ID from a Location header
+// Location format: .../{resource}/{id}
+func idFromLocation(location string) string {
+	if location == "" {
+		return ""
+	}
+	parts := bytes.Split([]byte(location), []byte("/"))
+	return string(parts[len(parts)-1])
+}
+
 // CreateUser creates a new user in Keycloak
 func (s *KeycloakAdminService) CreateUser(ctx context.Context, req KeycloakUserRequest) (string, *errors.AppError) {
 	var userID string
 
-	// First, check if user already exists
-	existingUser, err := s.GetUserByEmail(ctx, req.Email)
-	if err == nil && existingUser != nil {
-		return "", errors.NewAppError(entities.ErrConflict, "User with this email already exists", nil, nil)
-	}
-
+	// No existence pre-check: Keycloak rejects duplicate users with 409 Conflict
 	httpReq, buildErr := s.buildCreateUserRequest(ctx, req)
 	if buildErr != nil {
 		s.logger.Error(ctx, "Failed to build create user request", map[string]interface{}{"error": buildErr.Error()})
 		return "", errors.NewAppError(entities.ErrService, "Failed to create user in Keycloak", nil, buildErr)
 	}
 
-	resp, httpErr := s.client.Do(httpReq)
+	resp, httpErr := s.sendWithRetry(ctx, httpReq)
 	if httpErr != nil {
 		s.logger.Error(ctx, "Failed to create user", map[string]interface{}{"error": httpErr.Error()})
 		return "", errors.NewAppError(entities.ErrService, "Failed to create user in Keycloak", nil, httpErr)
 	}
 	defer resp.Body.Close()
 
+	if resp.StatusCode == http.StatusConflict {
+		return "", errors.NewAppError(entities.ErrConflict, "User with this email already exists", nil, nil)
+	}
+
 	if resp.StatusCode != http.StatusCreated {
 		body, _ := io.ReadAll(resp.Body)
 		s.logger.Error(ctx, "Keycloak user creation failed", map[string]interface{}{
@@ -272,20 +430,15 @@ func (s *KeycloakAdminService) CreateUser(ctx context.Context, req KeycloakUserR
 	}
 
 	// Extract user ID from Location header
-	location := resp.Header.Get("Location")
-	if location != "" {
-		parts := bytes.Split([]byte(location), []byte("/"))
-		if len(parts) > 0 {
-			userID = string(parts[len(parts)-1])
-		}
-	}
+	userID = idFromLocation(resp.Header.Get("Location"))
 
 	return userID, nil
 }
 
 func (s *KeycloakAdminService) buildCreateUserRequest(ctx context.Context, req KeycloakUserRequest) (*http.Request, error) {
-	if err := s.getAccessToken(ctx); err != nil {
-		return nil, fmt.Errorf("failed to get access token: %v", err)
+	token, tokenErr := s.getAccessToken(ctx)
+	if tokenErr != nil {
+		return nil, fmt.Errorf("failed to get access token: %v", tokenErr)
 	}
 
 	url := fmt.Sprintf("%s/admin/realms/%s/users", s.baseURL, s.realm)
@@ -301,7 +454,7 @@ func (s *KeycloakAdminService) buildCreateUserRequest(ctx context.Context, req K
 	}
 
 	httpReq.Header.Set("Content-Type", "application/json")
-	httpReq.Header.Set("Authorization", fmt.Sprintf("Bearer %s", s.accessToken))
+	httpReq.Header.Set("Authorization", fmt.Sprintf("Bearer %s", token))
 
 	return httpReq, nil
 }
@@ -322,18 +475,40 @@ func (s *KeycloakAdminService) SetUserPassword(ctx context.Context, userID, pass
 // AssignRoleToUser assigns a realm role to a user
 func (s *KeycloakAdminService) AssignRoleToUser(ctx context.Context, userID, roleName string) *errors.AppError {
 	// First, get the role representation
+	role, err := s.getRealmRole(ctx, roleName)
+	if err != nil {
+		return err
+	}
+
+	// Assign the role to the user
+	path := fmt.Sprintf("users/%s/role-mappings/realm", userID)
+	if err := s.doRequest(ctx, http.MethodPost, path, []map[string]interface{}{role}, nil); err != nil {
+		// The cached representation may be stale (e.g. the role was recreated)
+		s.roleCache.Delete(roleName)
+		return err
+	}
+
+	return nil
+}
+
+// getRealmRole returns a realm role representation, caching it by name since
+// the same few roles are assigned on every user creation
+func (s *KeycloakAdminService) getRealmRole(ctx context.Context, roleName string) (map[string]interface{}, *errors.AppError) {
+	if cached, ok := s.roleCache.Load(roleName); ok {
+		return cached.(map[string]interface{}), nil
+	}
+
 	var role map[string]interface{}
 	if err := s.doRequest(ctx, http.MethodGet, fmt.Sprintf("roles/%s", roleName), nil, &role); err != nil {
-		return err
+		return nil, err
 	}
 
 	if role == nil {
-		return errors.NewAppError(entities.ErrNotFound, "Role not found", nil, nil)
+		return nil, errors.NewAppError(entities.ErrNotFound, "Role not found", nil, nil)
 	}
 
-	// Assign the role to the user
-	path := fmt.Sprintf("users/%s/role-mappings/realm", userID)
-	return s.doRequest(ctx, http.MethodPost, path, []map[string]interface{}{role}, nil)
+	s.roleCache.Store(roleName, role)
+	return role, nil
 }
 
 // AddUserToGroup adds a user to a group
@@ -365,40 +540,38 @@ func (s *KeycloakAdminService) SetUserAttributes(ctx context.Context, userID str
 
 // GetOrCreateGroup gets an existing group by name or creates it if it doesn't exist
 func (s *KeycloakAdminService) GetOrCreateGroup(ctx context.Context, groupName string) (string, *errors.AppError) {
-	// Search for existing group
-	var groups []KeycloakGroupResponse
-	if err := s.doRequest(ctx, http.MethodGet, fmt.Sprintf("groups?search=%s", groupName), nil, &groups); err != nil {
-		return "", err
+	// Try to create the group first; Keycloak answers 409 when it already exists
+	groupReq := KeycloakGroupRequest{
+		Name: groupName,
 	}
 
-	// Check if group exists
-	for _, group := range groups {
-		if group.Name == groupName {
-			return group.ID, nil
+	// The new group ID is taken from the Location header of the 201 response
+	var groupID string
+	createErr := s.doRequest(ctx, http.MethodPost, "groups", groupReq, &groupID)
+	if createErr == nil {
+		if groupID == "" {
+			s.logger.Error(ctx, "Keycloak group creation returned no Location header", map[string]interface{}{"group_name": groupName})
+			return "", errors.NewAppError(entities.ErrService, "Failed to process Keycloak response", nil, nil)
 		}
+		return groupID, nil
 	}
-
-	// Create new group
-	groupReq := KeycloakGroupRequest{
-		Name: groupName,
+	if createErr.Type != entities.ErrConflict {
+		return "", createErr
 	}
 
-	var groupID string
-	if err := s.doRequest(ctx, http.MethodPost, "groups", groupReq, &groupID); err != nil {
+	// Group already exists, look it up by exact name
+	var groups []KeycloakGroupResponse
+	if err := s.doRequest(ctx, http.MethodGet, fmt.Sprintf("groups?search=%s&exact=true", url.QueryEscape(groupName)), nil, &groups); err != nil {
 		return "", err
 	}
 
-	// If groupID is empty, fetch the created group
-	if groupID == "" {
-		if err := s.doRequest(ctx, http.MethodGet, fmt.Sprintf("groups?search=%s", groupName), nil, &groups); err != nil {
-			return "", err
-		}
-		if len(groups) > 0 {
-			groupID = groups[0].ID
+	for _, group := range groups {
+		if group.Name == groupName {
+			return group.ID, nil
 		}
 	}
 
-	return groupID, nil
+	return "", errors.NewAppError(entities.ErrNotFound, "Group not found", nil, nil)
 }
 
 // SetGroupAttributes sets custom attributes for a group
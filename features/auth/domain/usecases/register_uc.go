@@ -310,12 +310,22 @@ func (uc *RegisterUseCase) createKeycloakUser(ctx context.Context, request authE
 		"email":   request.Email,
 	})
 
+	// The organization group does not depend on the password or role, so it is set up
+	// concurrently with steps 2 and 3; only adding the user to it (step 5) needs both IDs
+	groupName := fmt.Sprintf("org-%s", organizationID)
+	groupIDCh := make(chan string, 1)
+	go func() {
+		groupIDCh <- uc.setupOrganizationGroup(ctx, groupName, organizationID, companyName)
+	}()
+
 	// 2. Set user password
 	if err := uc.keycloakService.SetUserPassword(ctx, userID, request.Password); err != nil {
 		uc.logger.Error(ctx, "Failed to set user password", map[string]interface{}{
 			"error":   err.Error(),
 			"user_id": userID,
 		})
+		// Wait for the group setup so it is not cut off when the request context ends
+		<-groupIDCh
 		return "", fmt.Errorf("failed to set user password: %w", err)
 	}
 
@@ -331,30 +341,14 @@ func (uc *RegisterUseCase) createKeycloakUser(ctx context.Context, request authE
 		})
 	}
 
-	// 4. Get or create organization group
-	groupName := fmt.Sprintf("org-%s", organizationID)
-	groupID, err := uc.keycloakService.GetOrCreateGroup(ctx, groupName)
-	if err != nil {
-		uc.logger.Error(ctx, "Failed to get/create organization group", map[string]interface{}{
-			"error":      err.Error(),
-			"group_name": groupName,
-		})
+	// 4. Wait for the organization group set up in the background
+	groupID := <-groupIDCh
+	if groupID == "" {
 		// Non-fatal error, continue
 		uc.logger.Info(ctx, "User will need to be added to group manually", map[string]interface{}{
 			"user_id": userID,
 		})
 	} else {
-		// Set organization_id and company_name attributes on group
-		if err := uc.keycloakService.SetGroupAttributes(ctx, groupID, map[string][]string{
-			"organization_id": {organizationID},
-			"company_name":    {companyName},
-		}); err != nil {
-			uc.logger.Error(ctx, "Failed to set group attributes", map[string]interface{}{
-				"error":    err.Error(),
-				"group_id": groupID,
-			})
-		}
-
 		// 5. Add user to organization group
 		if err := uc.keycloakService.AddUserToGroup(ctx, userID, groupID); err != nil {
 			uc.logger.Error(ctx, "Failed to add user to group", map[string]interface{}{
@@ -377,6 +371,32 @@ func (uc *RegisterUseCase) createKeycloakUser(ctx context.Context, request authE
 	return userID, nil
 }
 
+// setupOrganizationGroup gets or creates the organization group and sets its attributes.
+// It returns an empty group ID when the group could not be obtained.
+func (uc *RegisterUseCase) setupOrganizationGroup(ctx context.Context, groupName string, organizationID string, companyName string) string {
+	groupID, err := uc.keycloakService.GetOrCreateGroup(ctx, groupName)
+	if err != nil {
+		uc.logger.Error(ctx, "Failed to get/create organization group", map[string]interface{}{
+			"error":      err.Error(),
+			"group_name": groupName,
+		})
+		return ""
+	}
+
+	// Set organization_id and company_name attributes on group
+	if err := uc.keycloakService.SetGroupAttributes(ctx, groupID, map[string][]string{
+		"organization_id": {organizationID},
+		"company_name":    {companyName},
+	}); err != nil {
+		uc.logger.Error(ctx, "Failed to set group attributes", map[string]interface{}{
+			"error":    err.Error(),
+			"group_id": groupID,
+		})
+	}
+
+	return groupID
+}
+
 func (uc *RegisterUseCase) createAsaasCustomer(ctx context.Context, request authEntities.RegisterRequest, organizationID string) (*services.AsaasCustomerResponse, error) {
 	uc.logger.Info(ctx, "Creating Asaas customer", map[string]interface{}{
 		"organization_id": organizationID,